@@ -33,7 +33,7 @@ from app.services.indicator_versions import (
     restore_version as restore_indicator_code_version,
 )
 from app.utils.auth import login_required
-from app.services.indicator_params import IndicatorParamsParser
+from app.services.indicator_params import IndicatorParamsParser, serialize_params
 from app.services.indicator_validation import (
     generate_mock_df,
     indicator_debug_summary,
@@ -373,6 +373,7 @@ def save_indicator():
             name = "Custom Indicator"
 
         now = _now_ts()  # For BIGINT fields (createtime, updatetime)
+        params_json = serialize_params(code)
 
         user_role = getattr(g, 'user_role', 'user')
         is_admin = user_role == 'admin'
@@ -410,7 +411,7 @@ def save_indicator():
                         cur.execute(
                             """
                             UPDATE qd_indicator_codes
-                            SET name = ?, code = ?, description = ?,
+                            SET name = ?, code = ?, params_json = ?, description = ?,
                                 publish_to_community = ?, pricing_type = ?, price = ?, preview_image = ?,
                                 vip_free = ?, asset_type = ?, is_encrypted = ?,
                                 review_status = ?, review_note = '',
@@ -419,7 +420,7 @@ def save_indicator():
                                 updatetime = ?, updated_at = NOW()
                             WHERE id = ? AND user_id = ? AND (is_buy IS NULL OR is_buy = 0)
                             """,
-                            (name, code, description, publish_to_community, pricing_type, price, preview_image, vip_free, asset_type, 1 if code_hidden else 0,
+                            (name, code, params_json, description, publish_to_community, pricing_type, price, preview_image, vip_free, asset_type, 1 if code_hidden else 0,
                              new_review_status, new_review_status, reviewer_id, now, indicator_id, user_id),
                         )
                     else:
@@ -427,7 +428,7 @@ def save_indicator():
                         cur.execute(
                             """
                             UPDATE qd_indicator_codes
-                            SET name = ?, code = ?, description = ?,
+                            SET name = ?, code = ?, params_json = ?, description = ?,
                                 publish_to_community = ?, pricing_type = ?, price = ?, preview_image = ?,
                                 vip_free = ?, asset_type = ?, is_encrypted = ?,
                                 review_status = ?, review_note = '',
@@ -436,21 +437,21 @@ def save_indicator():
                                 updatetime = ?, updated_at = NOW()
                             WHERE id = ? AND user_id = ? AND (is_buy IS NULL OR is_buy = 0)
                             """,
-                            (name, code, description, publish_to_community, pricing_type, price, preview_image, vip_free, asset_type, 1 if code_hidden else 0,
+                            (name, code, params_json, description, publish_to_community, pricing_type, price, preview_image, vip_free, asset_type, 1 if code_hidden else 0,
                              new_review_status, new_review_status, reviewer_id, now, indicator_id, user_id),
                         )
                 else:
                     cur.execute(
                         """
                         UPDATE qd_indicator_codes
-                        SET name = ?, code = ?, description = ?,
+                        SET name = ?, code = ?, params_json = ?, description = ?,
                             publish_to_community = ?, pricing_type = ?, price = ?, preview_image = ?,
                             vip_free = FALSE, asset_type = ?,
                             review_status = NULL, review_note = '', reviewed_at = NULL, reviewed_by = NULL,
                             updatetime = ?, updated_at = NOW()
                         WHERE id = ? AND user_id = ?
                         """,
-                        (name, code, description, publish_to_community, pricing_type, price, preview_image, asset_type, now, indicator_id, user_id),
+                        (name, code, params_json, description, publish_to_community, pricing_type, price, preview_image, asset_type, now, indicator_id, user_id),
                     )
             else:
                 review_status = None
@@ -459,12 +460,12 @@ def save_indicator():
                 cur.execute(
                     """
                     INSERT INTO qd_indicator_codes
-                      (user_id, is_buy, end_time, name, code, description,
+                      (user_id, is_buy, end_time, name, code, params_json, description,
                        publish_to_community, pricing_type, price, preview_image, vip_free, asset_type, review_status, is_encrypted,
                        createtime, updatetime, created_at, updated_at)
-                    VALUES (?, 0, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NOW(), NOW())
+                    VALUES (?, 0, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NOW(), NOW())
                     """,
-                    (user_id, name, code, description, publish_to_community, pricing_type, price, preview_image, vip_free, asset_type, review_status, 1 if code_hidden else 0, now, now),
+                    (user_id, name, code, params_json, description, publish_to_community, pricing_type, price, preview_image, vip_free, asset_type, review_status, 1 if code_hidden else 0, now, now),
                 )
                 indicator_id = int(cur.lastrowid or 0)
             if indicator_id and indicator_id > 0:
@@ -7,7 +7,9 @@ Features:
 2. Retrieve similar historical patterns
 3. Track decision outcomes for learning
 """
+import heapq
 import json
+import os
 import time
 import hashlib
 from typing import Dict, Any, List, Optional
@@ -161,6 +163,12 @@ class AnalysisMemory:
                     
                     CREATE INDEX IF NOT EXISTS idx_analysis_memory_user
                     ON qd_analysis_memory(user_id);
+
+                    -- Serves get_similar_patterns: equality on (market, symbol)
+                    -- plus its ORDER BY, so the LIMIT stops after a few entries.
+                    CREATE INDEX IF NOT EXISTS idx_analysis_memory_symbol_validated
+                    ON qd_analysis_memory(market, symbol, validated_at DESC NULLS LAST, created_at DESC)
+                    WHERE validated_at IS NOT NULL;
                 """)
                 
                 db.commit()
@@ -569,8 +577,8 @@ class AnalysisMemory:
                         "similarity_score": round(sim + bonus, 3),
                     }))
                 
-                scored.sort(key=lambda x: -x[0])
-                return [p[1] for p in scored[:limit]]
+                top = heapq.nlargest(limit, scored, key=lambda x: x[0])
+                return [p[1] for p in top]
                 
         except Exception as e:
             logger.error(f"Failed to get similar patterns: {e}")
@@ -636,6 +644,7 @@ class AnalysisMemory:
                 """, (days_ago_int, int(days_ago_int + 1)))
                 
                 rows = cur.fetchall() or []
+                updates = []
                 
                 for row in rows:
                     try:
@@ -662,31 +671,23 @@ class AnalysisMemory:
                         elif decision == 'HOLD' and abs(return_pct) <= 5:
                             was_correct = True
                         
-                        # Update record
-                        cur.execute("""
-                            UPDATE qd_analysis_memory
-                            SET validated_at = NOW(),
-                                actual_return_pct = %s,
-                                was_correct = %s
-                            WHERE id = %s
-                        """, (return_pct, was_correct, row['id']))
-                        
-                        stats["validated"] += 1
-                        if was_correct:
-                            stats["correct"] += 1
-                        else:
-                            stats["incorrect"] += 1
+                        updates.append((int(row['id']), return_pct, was_correct))
                             
                     except Exception as e:
                         logger.warning(f"Failed to validate memory {row['id']}: {e}")
                         stats["errors"] += 1
                 
+                _write_validation_outcomes(cur, updates)
                 db.commit()
                 cur.close()
+                _tally_validation_outcomes(stats, updates)
                 
         except Exception as e:
             logger.error(f"Validation batch failed: {e}")
         
+        if stats["validated"]:
+            self._invalidate_bucket_accuracy_cache()
+
         accuracy = (stats["correct"] / stats["validated"] * 100) if stats["validated"] > 0 else 0
         stats["accuracy_pct"] = round(accuracy, 2)
         
@@ -726,6 +727,7 @@ class AnalysisMemory:
                     (min_age_days_int, limit_int),
                 )
                 rows = cur.fetchall() or []
+                updates = []
 
                 for row in rows:
                     try:
@@ -748,31 +750,20 @@ class AnalysisMemory:
                         elif decision == "HOLD" and abs(return_pct) <= 5:
                             was_correct = True
 
-                        cur.execute(
-                            """
-                            UPDATE qd_analysis_memory
-                            SET validated_at = NOW(),
-                                actual_return_pct = %s,
-                                was_correct = %s
-                            WHERE id = %s
-                            """,
-                            (return_pct, was_correct, int(row["id"])),
-                        )
-
-                        stats["validated"] += 1
-                        if was_correct:
-                            stats["correct"] += 1
-                        else:
-                            stats["incorrect"] += 1
+                        updates.append((int(row["id"]), return_pct, was_correct))
                     except Exception as e:
                         logger.warning(f"Failed to validate memory {row.get('id')}: {e}", exc_info=True)
                         stats["errors"] += 1
 
+                _write_validation_outcomes(cur, updates)
                 db.commit()
                 cur.close()
+                _tally_validation_outcomes(stats, updates)
         except Exception as e:
             logger.error(f"validate_unvalidated_older_than failed: {e}", exc_info=True)
 
+        if stats["validated"]:
+            self._invalidate_bucket_accuracy_cache()
         return stats
     
     def get_confidence_accuracy_by_bucket(
@@ -782,11 +773,19 @@ class AnalysisMemory:
         Compute actual accuracy by confidence bucket for calibration.
         Buckets: (50,60), (60,70), (70,80), (80,90), (90,100).
         Returns e.g. {"60_70": 0.58, "70_80": 0.62} - bucket_key -> accuracy.
+
+        Bucketing and counting happen in SQL so only one row per bucket is
+        transferred instead of every validated analysis in the window.
         """
         try:
             with get_db_connection() as db:
                 cur = db.cursor()
-                where = ["validated_at IS NOT NULL", "was_correct IS NOT NULL", "confidence IS NOT NULL"]
+                where = [
+                    "validated_at IS NOT NULL",
+                    "was_correct IS NOT NULL",
+                    "confidence >= 50",
+                    "confidence < 101",
+                ]
                 params = []
                 days_int = int(days)
                 if market:
@@ -799,21 +798,26 @@ class AnalysisMemory:
                 params.append(days_int)
                 params = tuple(params) if params else ()
                 cur.execute(f"""
-                    SELECT confidence, was_correct
+                    SELECT
+                        LEAST(FLOOR(confidence / 10) * 10, 90)::int AS bucket_lo,
+                        COUNT(*) AS total,
+                        SUM(CASE WHEN was_correct THEN 1 ELSE 0 END) AS correct
                     FROM qd_analysis_memory
                     WHERE {' AND '.join(where)}
+                    GROUP BY bucket_lo
                 """, params)
                 rows = cur.fetchall() or []
                 cur.close()
 
+            counts = {int(r["bucket_lo"]): r for r in rows if r.get("bucket_lo") is not None}
             buckets = [(50, 60), (60, 70), (70, 80), (80, 90), (90, 101)]
             out = {}
             for lo, hi in buckets:
-                subset = [r for r in rows if lo <= (r.get("confidence") or 0) < hi]
-                if len(subset) < 5:
+                row = counts.get(lo)
+                total = int(row.get("total") or 0) if row else 0
+                if total < 5:
                     continue
-                correct = sum(1 for r in subset if r.get("was_correct"))
-                out[f"{lo}_{hi}"] = correct / len(subset)
+                out[f"{lo}_{hi}"] = int(row.get("correct") or 0) / total
             return out
         except Exception as e:
             logger.warning(f"get_confidence_accuracy_by_bucket failed: {e}")
@@ -834,7 +838,7 @@ class AnalysisMemory:
                 break
         if not bucket_key:
             return max(1, min(99, int(raw_confidence)))
-        acc_map = self.get_confidence_accuracy_by_bucket(market=market, symbol=symbol)
+        acc_map = self._get_cached_bucket_accuracy(market=market, symbol=symbol)
         acc = acc_map.get(bucket_key)
         if acc is None or acc <= 0:
             return max(1, min(99, int(raw_confidence)))
@@ -845,6 +849,29 @@ class AnalysisMemory:
         adjusted = int(raw_confidence * factor)
         return max(1, min(99, adjusted))
 
+    def _get_cached_bucket_accuracy(self, market: str = None, symbol: str = None) -> Dict[str, float]:
+        """
+        Bucket accuracy for calibration, cached briefly per (market, symbol).
+        Every analysis of the same symbol would otherwise re-run the aggregate.
+        """
+        now = time.time()
+        if not hasattr(self, "_bucket_accuracy_cache"):
+            self._bucket_accuracy_cache = {}
+        ttl = int(os.getenv("CONFIDENCE_CALIBRATION_CACHE_TTL_SEC", "300"))
+        key = (market or "", symbol or "")
+        cached = self._bucket_accuracy_cache.get(key)
+        if cached and (now - cached[0]) < ttl:
+            return cached[1]
+
+        acc_map = self.get_confidence_accuracy_by_bucket(market=market, symbol=symbol)
+        self._bucket_accuracy_cache[key] = (now, acc_map)
+        return acc_map
+
+    def _invalidate_bucket_accuracy_cache(self) -> None:
+        """Drop cached calibration buckets after new outcomes are validated."""
+        if hasattr(self, "_bucket_accuracy_cache"):
+            self._bucket_accuracy_cache.clear()
+
     def get_performance_stats(self, market: str = None, symbol: str = None, 
                               days: int = 30) -> Dict[str, Any]:
         """
@@ -926,14 +953,41 @@ class AnalysisMemory:
             }
 
 
+def _write_validation_outcomes(cur, updates: List[tuple]) -> None:
+    """Persist (id, return_pct, was_correct) outcomes with a single UPDATE."""
+    if not updates:
+        return
+    ids, returns, flags = zip(*updates)
+    cur.execute("""
+        UPDATE qd_analysis_memory AS m
+        SET validated_at = NOW(),
+            actual_return_pct = v.return_pct,
+            was_correct = v.was_correct
+        FROM unnest(%s::int[], %s::numeric[], %s::boolean[]) AS v(id, return_pct, was_correct)
+        WHERE m.id = v.id
+    """, (list(ids), list(returns), list(flags)))
+
+
+def _tally_validation_outcomes(stats: Dict[str, Any], updates: List[tuple]) -> None:
+    """Count written outcomes into the validation stats dict."""
+    for _memory_id, _return_pct, was_correct in updates:
+        stats["validated"] += 1
+        if was_correct:
+            stats["correct"] += 1
+        else:
+            stats["incorrect"] += 1
+
+
+_LOW_VOL_BANDS = frozenset({"low", "normal", "normal_low"})
+_HIGH_VOL_BANDS = frozenset({"high", "elevated", "volatile", "very_high"})
+
+
 def _vol_bands_similar(a: str, b: str) -> bool:
     """Check if two volatility levels are in similar band."""
-    low = {"low", "normal", "normal_low"}
-    high = {"high", "elevated", "volatile", "very_high"}
     a, b = a.lower(), b.lower()
-    if a in low and b in low:
+    if a in _LOW_VOL_BANDS and b in _LOW_VOL_BANDS:
         return True
-    if a in high and b in high:
+    if a in _HIGH_VOL_BANDS and b in _HIGH_VOL_BANDS:
         return True
     return False
 
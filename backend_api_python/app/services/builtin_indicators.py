@@ -302,7 +302,7 @@ def upgrade_builtin_indicator_samples() -> int:
                 cur.execute(
                     """
                     UPDATE qd_indicator_codes
-                    SET name = ?, code = ?, description = ?,
+                    SET name = ?, code = ?, params_json = NULL, description = ?,
                         updatetime = ?, updated_at = NOW()
                     WHERE id = ?
                     """,
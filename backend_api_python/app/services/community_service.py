@@ -464,7 +464,7 @@ class CommunityService:
                     cur.execute(
                         """
                         UPDATE qd_indicator_codes
-                        SET name = ?, code = ?, description = ?,
+                        SET name = ?, code = ?, params_json = NULL, description = ?,
                             publish_to_community = 1, pricing_type = ?, price = ?,
                             is_encrypted = ?, vip_free = ?,
                             asset_type = 'script_template',
@@ -1236,6 +1236,7 @@ class CommunityService:
                     """
                     UPDATE qd_indicator_codes
                     SET code = ?,
+                        params_json = NULL,
                         description = ?,
                         preview_image = ?,
                         is_encrypted = ?,
@@ -33,7 +33,8 @@ def _has_my_indicator_meta(code: str) -> tuple[bool, bool]:
 
 
 def _has_df_copy(code: str) -> bool:
-    return bool(re.search(r"df\s*=\s*df\.copy\s*\(\s*\)", code or ""))
+    # A shallow copy (deep=False) is enough: new columns never touch the caller's frame.
+    return bool(re.search(r"df\s*=\s*df\.copy\s*\(\s*(?:deep\s*=\s*(?:True|False)\s*)?\)", code or ""))
 
 
 def _declared_param_names(code: str) -> List[str]:
@@ -1,7 +1,11 @@
 ﻿"""Parameter parsing and composition for chart indicators."""
 
+import json
 import re
-from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+import sys
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple, TYPE_CHECKING
 
 from app.utils.db import get_db_connection
 from app.utils.logger import get_logger
@@ -11,12 +15,36 @@ if TYPE_CHECKING:
 
 logger = get_logger(__name__)
 
+_TRUTHY = frozenset({'true', '1', 'yes', 'on'})
+
+# Declared ``@param`` type -> converter for raw string values.
+_CONVERTERS = {
+    'int': int,
+    'float': float,
+    'bool': lambda v: str(v).lower() in _TRUTHY,
+    'str': str,
+    'string': str,
+}
+
+# Declared type (lower-cased) -> canonical name; literal values are interned.
+_CANONICAL_TYPES = {'int': 'int', 'float': 'float', 'bool': 'bool', 'str': 'str', 'string': 'str'}
+
+# Literal every declaration must contain; PARAM_PATTERN is case-insensitive too.
+_PARAM_NEEDLE = re.compile(r'@param', re.IGNORECASE)
+
+
+def _may_declare_params(indicator_code: str) -> bool:
+    """Cheap literal pre-check run before any line-anchored regex work."""
+    return '@' in indicator_code and _PARAM_NEEDLE.search(indicator_code) is not None
+
+
 class IndicatorParamsParser:
     """Parse chart indicator ``# @param`` declarations."""
     
+    # Anchored per line so a single finditer() can sweep the whole source.
     PARAM_PATTERN = re.compile(
-        r'#\s*@param\s+(\w+)\s+(int|float|bool|str|string)\s+(\S+)\s*(.*)',
-        re.IGNORECASE
+        r'^[ \t]*#[ \t]*@param[ \t]+(\w+)[ \t]+(int|float|bool|str|string)[ \t]+(\S+)[ \t]*(.*)$',
+        re.IGNORECASE | re.MULTILINE
     )
 
     # Optional sweep declarations inside the description:
@@ -45,39 +73,41 @@ class IndicatorParamsParser:
 
         Optional sweep grammar (numeric params only):
         Sweep markers are stripped from the human description before being returned.
+
+        Results are memoized by source text; each call returns fresh dicts.
         """
+        # Most indicators declare no params: a literal scan settles them
+        # without touching the regex or occupying a cache slot.
+        if not indicator_code or not _may_declare_params(indicator_code):
+            return []
+        return [_copy_param(p) for p in _parse_params_cached(indicator_code)]
+
+    @classmethod
+    def _parse_params_uncached(cls, indicator_code: str) -> List[Dict[str, Any]]:
         params = []
-        if not indicator_code:
-            return params
-        
-        for line in indicator_code.split('\n'):
-            line = line.strip()
-            match = cls.PARAM_PATTERN.match(line)
-            if match:
-                name = match.group(1)
-                param_type = match.group(2).lower()
-                default_str = match.group(3)
-                description = match.group(4).strip() if match.group(4) else ''
-                
-                default = cls._convert_value(default_str, param_type)
-                
-                if param_type == 'string':
-                    param_type = 'str'
-
-                values: Optional[List[Any]] = None
-                if param_type in ('int', 'float'):
-                    values = cls._extract_sweep_values(description, param_type)
-                description = cls._strip_sweep_markers(description)
-
-                entry: Dict[str, Any] = {
-                    "name": name,
-                    "type": param_type,
-                    "default": default,
-                    "description": description,
-                }
-                if values:
-                    entry["values"] = values
-                params.append(entry)
+        for match in cls.PARAM_PATTERN.finditer(indicator_code):
+            name, param_type, default_str, description = match.groups()
+            # Names become params[...] keys in every run; share one string object.
+            name = sys.intern(name)
+            param_type = _CANONICAL_TYPES[param_type.lower()]
+            description = description.strip() if description else ''
+            
+            default = cls._convert_value(default_str, param_type)
+
+            values: Optional[List[Any]] = None
+            if param_type in ('int', 'float'):
+                values = cls._extract_sweep_values(description, param_type)
+            description = cls._strip_sweep_markers(description)
+
+            entry: Dict[str, Any] = {
+                "name": name,
+                "type": param_type,
+                "default": default,
+                "description": description,
+            }
+            if values:
+                entry["values"] = values
+            params.append(entry)
         
         return params
 
@@ -148,15 +178,7 @@ class IndicatorParamsParser:
     def _convert_value(cls, value_str: str, param_type: str) -> Any:
         """Convert a raw string value to the declared parameter type."""
         try:
-            param_type = param_type.lower()
-            if param_type == 'int':
-                return int(value_str)
-            elif param_type == 'float':
-                return float(value_str)
-            elif param_type == 'bool':
-                return value_str.lower() in ('true', '1', 'yes', 'on')
-            else:  # str/string
-                return value_str
+            return _CONVERTERS.get(param_type.lower(), str)(value_str)
         except (ValueError, TypeError):
             return value_str
     
@@ -175,13 +197,10 @@ class IndicatorParamsParser:
         result = {}
         for param in declared_params:
             name = param['name']
-            param_type = param['type']
-            default = param['default']
-            
             if name in user_params:
-                result[name] = cls._convert_value(str(user_params[name]), param_type)
+                result[name] = cls._convert_value(str(user_params[name]), param['type'])
             else:
-                result[name] = default
+                result[name] = param['default']
         
         return result
 
@@ -195,16 +214,13 @@ class IndicatorParamsParser:
         """
         if not indicator_code or not param_values:
             return indicator_code or ""
+        if not _may_declare_params(indicator_code):
+            return indicator_code
 
-        lines = (indicator_code or "").split("\n")
-        changed = False
-        for idx, line in enumerate(lines):
-            match = cls.PARAM_PATTERN.match(line.strip())
-            if not match:
-                continue
+        def _rewrite(match: 're.Match[str]') -> str:
             name = match.group(1)
             if name not in param_values:
-                continue
+                return match.group(0)
             param_type = match.group(2).lower()
             if param_type == "string":
                 param_type = "str"
@@ -213,10 +229,63 @@ class IndicatorParamsParser:
                 val_str = "true" if raw_val else "false"
             else:
                 val_str = str(raw_val)
-            desc = match.group(4) or ""
-            lines[idx] = f"# @param {name} {param_type} {val_str} {desc}".rstrip()
-            changed = True
-        return "\n".join(lines) if changed else indicator_code
+            desc = (match.group(4) or "").strip()
+            return f"# @param {name} {param_type} {val_str} {desc}".rstrip()
+
+        # PARAM_PATTERN is line-anchored, so one pass rewrites declarations in place.
+        return cls.PARAM_PATTERN.sub(_rewrite, indicator_code)
+
+
+@lru_cache(maxsize=1024)
+def _parse_params_cached(indicator_code: str) -> Tuple[Mapping[str, Any], ...]:
+    """
+    Memoized parse keyed by source text, so cloned indicators share one entry.
+
+    Entries are read-only views; ``_copy_param`` hands callers mutable copies.
+    """
+    return tuple(_freeze_param(p) for p in IndicatorParamsParser._parse_params_uncached(indicator_code))
+
+
+def _freeze_param(param: Dict[str, Any]) -> Mapping[str, Any]:
+    if "values" in param:
+        param["values"] = tuple(param["values"])
+    return MappingProxyType(param)
+
+
+def _copy_param(param: Mapping[str, Any]) -> Dict[str, Any]:
+    entry = dict(param)
+    if "values" in entry:
+        entry["values"] = list(entry["values"])
+    return entry
+
+
+def _copy_on_write_enabled() -> bool:
+    import pandas as pd
+
+    try:
+        if int(pd.__version__.split('.')[0]) >= 3:
+            return True
+        return pd.get_option('mode.copy_on_write') is True
+    except Exception:
+        return False
+
+
+def _private_frame(df: 'pd.DataFrame') -> 'pd.DataFrame':
+    """Frame the called indicator may mutate without touching the caller's df.
+
+    Under pandas copy-on-write a shallow copy is enough: blocks are only
+    duplicated when the indicator actually writes to them.
+    """
+    return df.copy(deep=not _copy_on_write_enabled())
+
+
+def _float_column(df: 'pd.DataFrame', name: str) -> 'pd.Series':
+    import pandas as pd
+
+    if name not in df.columns:
+        return pd.Series(dtype='float64')
+    s = df[name]
+    return s if s.dtype == 'float64' else s.astype('float64')
 
 
 class IndicatorCaller:
@@ -235,6 +304,9 @@ class IndicatorCaller:
         self.user_id = user_id
         self.current_indicator_id = current_indicator_id
         self._call_stack = []  # Detect circular indicator dependencies.
+        # Lookups are memoized per caller (one chart run). Connections are still
+        # borrowed per query so nested calls never pin a pool slot for the run.
+        self._code_cache: Dict[Tuple[type, Any], Tuple[Optional[str], Optional[int]]] = {}
     
     def call_indicator(
         self, 
@@ -253,23 +325,30 @@ class IndicatorCaller:
             _depth: Internal recursion depth.
             
         Returns:
-            DataFrame after the called indicator runs.
+            DataFrame after the called indicator runs, or the input frame
+            unchanged when the call is rejected or fails. Empty input frames
+            and blank indicator bodies are returned without running anything.
         """
         import pandas as pd
         import numpy as np
         
         if _depth >= self.MAX_CALL_DEPTH:
             logger.error(f"Indicator call depth exceeded {self.MAX_CALL_DEPTH}")
-            return df.copy()
+            return df
+        # Warm-up bars call in with zero rows; there is nothing to compute yet.
+        if df is None or len(df) == 0:
+            return df if df is not None else pd.DataFrame()
         
         indicator_code, indicator_id = self._get_indicator_code(indicator_ref)
         if not indicator_code:
             logger.warning(f"Indicator not found: {indicator_ref}")
-            return df.copy()
+            return df
+        if not indicator_code.strip():
+            return df
         
         if indicator_id in self._call_stack:
             logger.error(f"Circular dependency detected: {self._call_stack} -> {indicator_id}")
-            return df.copy()
+            return df
         
         self._call_stack.append(indicator_id)
         
@@ -277,14 +356,14 @@ class IndicatorCaller:
             declared_params = IndicatorParamsParser.parse_params(indicator_code)
             merged_params = IndicatorParamsParser.merge_params(declared_params, params or {})
             
-            df_copy = df.copy()
+            df_copy = _private_frame(df)
             local_vars = {
                 'df': df_copy,
-                'open': df_copy['open'].astype('float64') if 'open' in df_copy.columns else pd.Series(dtype='float64'),
-                'high': df_copy['high'].astype('float64') if 'high' in df_copy.columns else pd.Series(dtype='float64'),
-                'low': df_copy['low'].astype('float64') if 'low' in df_copy.columns else pd.Series(dtype='float64'),
-                'close': df_copy['close'].astype('float64') if 'close' in df_copy.columns else pd.Series(dtype='float64'),
-                'volume': df_copy['volume'].astype('float64') if 'volume' in df_copy.columns else pd.Series(dtype='float64'),
+                'open': _float_column(df_copy, 'open'),
+                'high': _float_column(df_copy, 'high'),
+                'low': _float_column(df_copy, 'low'),
+                'close': _float_column(df_copy, 'close'),
+                'volume': _float_column(df_copy, 'volume'),
                 'signals': pd.Series(0, index=df_copy.index, dtype='float64'),
                 'np': np,
                 'pd': pd,
@@ -292,30 +371,36 @@ class IndicatorCaller:
                 'call_indicator': lambda ref, d, p=None: self.call_indicator(ref, d, p, _depth + 1)
             }
             
-            from app.utils.safe_exec import build_safe_builtins, safe_exec_with_validation
-
-            exec_env = local_vars.copy()
-            exec_env['__builtins__'] = build_safe_builtins()
+            from app.utils.safe_exec import safe_exec_with_validation
 
+            # safe_exec_with_validation installs the sandboxed __builtins__ and
+            # proxies the np/pd bound above, so no import prologue is needed.
+            exec_env = local_vars
             exec_result = safe_exec_with_validation(
                 code=indicator_code,
                 exec_globals=exec_env,
                 timeout=30,
+                pre_import="",
+                filename=f"<indicator {indicator_id}>",
             )
             if not exec_result['success']:
                 logger.error(f"Indicator {indicator_ref} rejected: {exec_result['error']}")
-                return df.copy()
+                return df
             
             return exec_env.get('df', df_copy)
             
         except Exception as e:
             logger.error(f"Error calling indicator {indicator_ref}: {e}")
-            return df.copy()
+            return df
         finally:
             self._call_stack.pop()
     
     def _get_indicator_code(self, indicator_ref: Any) -> Tuple[Optional[str], Optional[int]]:
         """Fetch indicator code by ID or name."""
+        key = (type(indicator_ref), indicator_ref)
+        cached = self._code_cache.get(key)
+        if cached is not None:
+            return cached
         try:
             with get_db_connection() as db:
                 cursor = db.cursor()
@@ -326,30 +411,41 @@ class IndicatorCaller:
                         WHERE id = %s AND (user_id = %s OR publish_to_community = 1)
                     """, (indicator_ref, self.user_id))
                 else:
+                    # Prefer the caller's own indicator over a community one of the same name.
                     cursor.execute("""
                         SELECT id, code FROM qd_indicator_codes 
-                        WHERE name = %s AND user_id = %s
-                        UNION
-                        SELECT id, code FROM qd_indicator_codes 
-                        WHERE name = %s AND publish_to_community = 1
+                        WHERE name = %s AND (user_id = %s OR publish_to_community = 1)
+                        ORDER BY (user_id = %s) DESC
                         LIMIT 1
-                    """, (str(indicator_ref), self.user_id, str(indicator_ref)))
+                    """, (str(indicator_ref), self.user_id, self.user_id))
                 
                 row = cursor.fetchone()
                 cursor.close()
                 
-                if row:
-                    return row['code'], row['id']
-                return None, None
-                
+            result = (row['code'], row['id']) if row else (None, None)
+            self._code_cache[key] = result
+            return result
         except Exception as e:
             logger.error(f"Error fetching indicator code: {e}")
             return None, None
 
 
+def serialize_params(indicator_code: str) -> str:
+    """
+    Serialize parameter declarations for the ``qd_indicator_codes.params_json`` column.
+
+    Writers that change ``code`` should store this alongside it so readers can
+    skip re-parsing the source.
+    """
+    return json.dumps(IndicatorParamsParser.parse_params(indicator_code or ''), ensure_ascii=False)
+
+
 def get_indicator_params(indicator_id: int) -> List[Dict[str, Any]]:
     """
     Return indicator parameter declarations for API consumers.
+
+    Reads the persisted ``params_json``; rows saved before the column existed are
+    parsed once and backfilled.
     
     Args:
         indicator_id: Indicator ID.
@@ -360,13 +456,31 @@ def get_indicator_params(indicator_id: int) -> List[Dict[str, Any]]:
     try:
         with get_db_connection() as db:
             cursor = db.cursor()
-            cursor.execute("SELECT code FROM qd_indicator_codes WHERE id = %s", (indicator_id,))
+            cursor.execute(
+                """
+                SELECT params_json, CASE WHEN params_json IS NULL THEN code END AS code
+                FROM qd_indicator_codes WHERE id = %s
+                """,
+                (indicator_id,),
+            )
             row = cursor.fetchone()
+            if not row:
+                cursor.close()
+                return []
+
+            stored = row.get('params_json')
+            if stored is not None:
+                cursor.close()
+                return json.loads(stored) if isinstance(stored, str) else list(stored)
+
+            code = row.get('code') or ''
+            cursor.execute(
+                "UPDATE qd_indicator_codes SET params_json = %s WHERE id = %s",
+                (serialize_params(code), indicator_id),
+            )
+            db.commit()
             cursor.close()
-            
-            if row and row['code']:
-                return IndicatorParamsParser.parse_params(row['code'])
-            return []
+            return IndicatorParamsParser.parse_params(code)
     except Exception as e:
         logger.error(f"Error getting indicator params: {e}")
         return []
@@ -1,5 +1,6 @@
 """Indicator code version history helpers."""
 
+from app.services.indicator_params import serialize_params
 from app.utils.db import get_db_connection
 
 
@@ -95,10 +96,10 @@ def restore_version(user_id: int, version_id: int, now_ts: int) -> dict | None:
         cur.execute(
             """
             UPDATE qd_indicator_codes
-            SET name = ?, description = ?, code = ?, updatetime = ?, updated_at = NOW()
+            SET name = ?, description = ?, code = ?, params_json = ?, updatetime = ?, updated_at = NOW()
             WHERE id = ? AND user_id = ?
             """,
-            (name, description, code, now_ts, indicator_id, user_id),
+            (name, description, code, serialize_params(code), now_ts, indicator_id, user_id),
         )
         version_no = insert_indicator_version(cur, indicator_id, user_id, name, description, code)
         db.commit()
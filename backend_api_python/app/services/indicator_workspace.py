@@ -7,6 +7,7 @@ import time
 from typing import Any, Dict, List, Optional
 
 from app.services.indicator_default_template import build_default_indicator_template
+from app.services.indicator_params import serialize_params
 from app.utils.db import get_db_connection
 from app.utils.logger import get_logger
 from app.utils.safe_exec import validate_code_safety
@@ -132,6 +133,7 @@ def save_user_indicator(
     description = (description or meta.get("description") or "").strip()
     now = int(time.time())
     iid = int(indicator_id or 0)
+    params_json = serialize_params(raw)
 
     with get_db_connection() as db:
         cur = db.cursor()
@@ -139,11 +141,11 @@ def save_user_indicator(
             cur.execute(
                 """
                 UPDATE qd_indicator_codes
-                SET name = ?, code = ?, description = ?, asset_type = ?,
+                SET name = ?, code = ?, params_json = ?, description = ?, asset_type = ?,
                     updatetime = ?, updated_at = NOW()
                 WHERE id = ? AND user_id = ? AND (is_buy IS NULL OR is_buy = 0)
                 """,
-                (name, raw, description, asset_type, now, iid, int(user_id)),
+                (name, raw, params_json, description, asset_type, now, iid, int(user_id)),
             )
             if cur.rowcount == 0:
                 cur.close()
@@ -152,12 +154,12 @@ def save_user_indicator(
             cur.execute(
                 """
                 INSERT INTO qd_indicator_codes
-                  (user_id, is_buy, end_time, name, code, description,
+                  (user_id, is_buy, end_time, name, code, params_json, description,
                    publish_to_community, pricing_type, price, preview_image, vip_free, asset_type,
                    createtime, updatetime, created_at, updated_at)
-                VALUES (?, 0, 1, ?, ?, ?, 0, 'free', 0, '', FALSE, ?, ?, ?, NOW(), NOW())
+                VALUES (?, 0, 1, ?, ?, ?, ?, 0, 'free', 0, '', FALSE, ?, ?, ?, NOW(), NOW())
                 """,
-                (int(user_id), name, raw, description, asset_type, now, now),
+                (int(user_id), name, raw, params_json, description, asset_type, now, now),
             )
             iid = int(cur.lastrowid or 0)
         db.commit()
@@ -215,7 +215,7 @@ class PendingOrderWorker(PendingOrderPositionSyncMixin):
                 self._tick()
             except Exception as e:
                 logger.warning(f"PendingOrderWorker tick error: {e}")
-            time.sleep(self.poll_interval_sec)
+            self._stop_event.wait(self.poll_interval_sec)
 
     def _tick(self) -> None:
         # logger.info(f"[PendingOrderWorker] _tick start. last_sync={self._last_position_sync_ts}")
@@ -8,6 +8,7 @@ import builtins as _builtins_mod
 import types
 from typing import Dict, Any, Optional, Tuple, Set
 from contextlib import contextmanager
+from functools import lru_cache
 
 from app.utils.logger import get_logger
 
@@ -240,7 +241,13 @@ def build_safe_builtins(extra_allowed: Optional[Set[str]] = None) -> Dict[str, A
     Args:
         extra_allowed: additional builtin names to include (use with caution)
     """
-    allowed = _BUILTINS_WHITELIST | (extra_allowed or set())
+    if not extra_allowed:
+        # Fresh dict per exec, copied from a table resolved once per process.
+        return dict(_default_safe_builtins())
+    return _resolve_safe_builtins(_BUILTINS_WHITELIST | extra_allowed)
+
+
+def _resolve_safe_builtins(allowed: Set[str]) -> Dict[str, Any]:
     safe = {}
     for name in allowed:
         val = getattr(_builtins_mod, name, None)
@@ -250,6 +257,11 @@ def build_safe_builtins(extra_allowed: Optional[Set[str]] = None) -> Dict[str, A
     return safe
 
 
+@lru_cache(maxsize=1)
+def _default_safe_builtins() -> Dict[str, Any]:
+    return _resolve_safe_builtins(_BUILTINS_WHITELIST)
+
+
 # Timeout (cross-platform)
 
 @contextmanager
@@ -311,12 +323,19 @@ def timeout_context(seconds: int):
 
 # Core execution
 
+@lru_cache(maxsize=256)
+def _compile_user_code(code: str, filename: str) -> types.CodeType:
+    """Compile validated user source once; re-runs of the same code reuse it."""
+    return compile(code, filename, 'exec')
+
+
 def safe_exec_code(
     code: str,
     exec_globals: Dict[str, Any],
     exec_locals: Optional[Dict[str, Any]] = None,
     timeout: int = 30,
-    max_memory_mb: Optional[int] = None
+    max_memory_mb: Optional[int] = None,
+    filename: str = '<string>',
 ) -> Dict[str, Any]:
     """Validate and execute Python code with sandbox namespace/timeout guards.
 
@@ -326,6 +345,7 @@ def safe_exec_code(
         exec_locals: locals dictionary; defaults to exec_globals.
         timeout: timeout in seconds.
         max_memory_mb: memory limit in MB when RLIMIT is enabled.
+        filename: name shown in tracebacks for the executed code.
     """
     is_safe, validation_error = validate_code_safety(code)
     if not is_safe:
@@ -357,7 +377,7 @@ def safe_exec_code(
                 logger.warning(f"Failed to set memory limit: {e}")
 
         with timeout_context(timeout):
-            exec(code, exec_globals, exec_locals)
+            exec(_compile_user_code(code, filename), exec_globals, exec_locals)
 
         return {'success': True, 'error': None, 'result': None}
 
@@ -381,6 +401,7 @@ def safe_exec_with_validation(
     timeout: int = 60,
     max_memory_mb: Optional[int] = None,
     pre_import: str = "import numpy as np\nimport pandas as pd\n",
+    filename: str = '<string>',
 ) -> Dict[str, Any]:
     """
     Validate + execute user code in one call.
@@ -424,6 +445,7 @@ def safe_exec_with_validation(
         exec_locals=exec_locals,
         timeout=timeout,
         max_memory_mb=max_memory_mb,
+        filename=filename,
     )
 
 
@@ -317,6 +317,10 @@ CREATE TABLE IF NOT EXISTS qd_strategies_trading (
 
 CREATE INDEX IF NOT EXISTS idx_strategies_user_id ON qd_strategies_trading(user_id);
 CREATE INDEX IF NOT EXISTS idx_strategies_status ON qd_strategies_trading(status);
+-- Live workers poll running live strategies (id, user_id) every cycle; keep that
+-- small set in a covering partial index instead of filtering the whole table.
+CREATE INDEX IF NOT EXISTS idx_strategies_running_live ON qd_strategies_trading(user_id, id)
+    WHERE status = 'running' AND execution_mode = 'live';
 
 -- Script source library: reusable code assets separated from live/runtime strategy rows.
 CREATE TABLE IF NOT EXISTS qd_script_sources (
@@ -790,6 +794,8 @@ ALTER TABLE qd_indicator_codes ADD COLUMN IF NOT EXISTS source_strategy_id int4
 ALTER TABLE qd_indicator_codes ADD COLUMN IF NOT EXISTS source_language varchar(16) DEFAULT NULL;
 ALTER TABLE qd_indicator_codes ADD COLUMN IF NOT EXISTS name_i18n jsonb DEFAULT NULL;
 ALTER TABLE qd_indicator_codes ADD COLUMN IF NOT EXISTS description_i18n jsonb DEFAULT NULL;
+-- Parsed ``# @param`` declarations cached at save time; NULL means "parse from code".
+ALTER TABLE qd_indicator_codes ADD COLUMN IF NOT EXISTS params_json jsonb DEFAULT NULL;
 
 CREATE INDEX IF NOT EXISTS idx_indicator_codes_user_id ON qd_indicator_codes USING btree (user_id);
 CREATE INDEX IF NOT EXISTS idx_indicator_review_status ON qd_indicator_codes USING btree (review_status);
@@ -1606,6 +1612,9 @@ CREATE INDEX IF NOT EXISTS idx_analysis_memory_symbol ON qd_analysis_memory(mark
 CREATE INDEX IF NOT EXISTS idx_analysis_memory_created ON qd_analysis_memory(created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_analysis_memory_validated ON qd_analysis_memory(validated_at) WHERE validated_at IS NOT NULL;
 CREATE INDEX IF NOT EXISTS idx_analysis_memory_user ON qd_analysis_memory(user_id);
+CREATE INDEX IF NOT EXISTS idx_analysis_memory_symbol_validated
+    ON qd_analysis_memory(market, symbol, validated_at DESC NULLS LAST, created_at DESC)
+    WHERE validated_at IS NOT NULL;
 
 -- Migration: Add user_id column to existing qd_analysis_memory table
 DO $$
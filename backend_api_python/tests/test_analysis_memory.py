@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import pytest
+
+from app.services import analysis_memory as memory_module
+
+
+class _Cursor:
+    def __init__(self, rows=None):
+        self.rows = list(rows or [])
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return list(self.rows)
+
+    def close(self):
+        return None
+
+
+class _Database:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.commits = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_args):
+        return False
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.commits += 1
+
+
+def _memory(monkeypatch, rows=None):
+    cursor = _Cursor(rows)
+    db = _Database(cursor)
+    monkeypatch.setattr(memory_module, "get_db_connection", lambda: db)
+    return object.__new__(memory_module.AnalysisMemory), cursor, db
+
+
+def test_confidence_buckets_are_aggregated_in_sql(monkeypatch):
+    memory, cursor, _db = _memory(
+        monkeypatch,
+        rows=[
+            {"bucket_lo": 60, "total": 10, "correct": 6},
+            {"bucket_lo": 70, "total": 4, "correct": 4},
+            {"bucket_lo": 90, "total": 8, "correct": 2},
+        ],
+    )
+
+    out = memory.get_confidence_accuracy_by_bucket(market="Crypto", symbol="BTC/USDT", days=30)
+
+    sql, params = cursor.executed[0]
+    assert "GROUP BY bucket_lo" in sql
+    assert params == ("Crypto", "BTC/USDT", 30)
+    assert out == {"60_70": pytest.approx(0.6), "90_101": pytest.approx(0.25)}
+
+
+def test_adjusted_confidence_reuses_cached_bucket_accuracy(monkeypatch):
+    memory = object.__new__(memory_module.AnalysisMemory)
+    calls = []
+
+    def fake_buckets(market=None, symbol=None, days=90):
+        calls.append((market, symbol))
+        return {"70_80": 0.5}
+
+    monkeypatch.setattr(memory, "get_confidence_accuracy_by_bucket", fake_buckets)
+
+    first = memory.get_adjusted_confidence(75, market="Crypto", symbol="BTC/USDT")
+    second = memory.get_adjusted_confidence(72, market="Crypto", symbol="BTC/USDT")
+    memory.get_adjusted_confidence(75, market="Crypto", symbol="ETH/USDT")
+
+    assert first == 50
+    assert second == 50
+    assert calls == [("Crypto", "BTC/USDT"), ("Crypto", "ETH/USDT")]
+
+    memory._invalidate_bucket_accuracy_cache()
+    memory.get_adjusted_confidence(75, market="Crypto", symbol="BTC/USDT")
+    assert len(calls) == 3
+
+
+def test_validation_cycle_writes_outcomes_in_one_statement(monkeypatch):
+    import sys
+    import types
+
+    rows = [
+        {"id": 1, "market": "Crypto", "symbol": "BTC/USDT", "decision": "BUY", "price_at_analysis": 100},
+        {"id": 2, "market": "Crypto", "symbol": "ETH/USDT", "decision": "SELL", "price_at_analysis": 100},
+        {"id": 3, "market": "Crypto", "symbol": "SOL/USDT", "decision": "HOLD", "price_at_analysis": 0},
+    ]
+    memory, cursor, db = _memory(monkeypatch, rows=rows)
+
+    class Collector:
+        def _get_price(self, market, symbol):
+            return {"price": 110}
+
+    monkeypatch.setitem(
+        sys.modules,
+        "app.services.market_data_collector",
+        types.SimpleNamespace(MarketDataCollector=Collector),
+    )
+
+    stats = memory.validate_unvalidated_older_than(min_age_days=7, limit=50)
+
+    updates = [(sql, params) for sql, params in cursor.executed if "UPDATE" in sql]
+    assert len(updates) == 1
+    assert "unnest" in updates[0][0]
+    assert updates[0][1] == ([1, 2], [pytest.approx(10.0), pytest.approx(10.0)], [True, False])
+    assert db.commits == 1
+    assert stats == {"validated": 2, "correct": 1, "incorrect": 1, "errors": 0}
+
+
+def _pattern_row(memory_id, rsi, macd="bullish", trend="uptrend", vol="normal", was_correct=True):
+    return {
+        "id": memory_id,
+        "decision": "BUY",
+        "confidence": 70,
+        "price_at_analysis": 100,
+        "summary": "",
+        "reasons": [],
+        "indicators_snapshot": {
+            "rsi": {"value": rsi},
+            "macd": {"signal": macd},
+            "moving_averages": {"trend": trend},
+            "volatility": {"level": vol},
+        },
+        "created_at": None,
+        "was_correct": was_correct,
+        "actual_return_pct": 3.0,
+    }
+
+
+def test_similar_patterns_returns_top_scores_in_order(monkeypatch):
+    rows = [
+        _pattern_row(1, rsi=70, macd="bearish"),
+        _pattern_row(2, rsi=50),
+        _pattern_row(3, rsi=80, macd="bearish", trend="downtrend", vol="very_high"),
+        _pattern_row(4, rsi=55, was_correct=False),
+    ]
+    memory, _cursor, _db = _memory(monkeypatch, rows=rows)
+    current = {
+        "rsi": {"value": 50},
+        "macd": {"signal": "bullish"},
+        "moving_averages": {"trend": "uptrend"},
+        "volatility": {"level": "low"},
+    }
+
+    out = memory.get_similar_patterns("Crypto", "BTC/USDT", current, limit=2)
+
+    assert [p["id"] for p in out] == [2, 4]
+    assert out[0]["similarity_score"] == pytest.approx(1.03)
@@ -172,3 +172,15 @@ output = {'name': 'T', 'plots': [], 'signals': [{'type': 'entry', 'data': entry_
 """
     hints = analyze_indicator_code_quality(code)
     assert any(h["code"] == "SIGNAL_MARKERS_USE_WHERE_NONE" for h in hints)
+
+
+def test_shallow_df_copy_satisfies_copy_hint():
+    base = """
+my_indicator_name = "T"
+my_indicator_description = "D"
+{copy}
+output = {{'name': 'T', 'plots': [], 'signals': []}}
+"""
+    for copy_line, missing in (("df = df.copy(deep=False)", False), ("df = df.copy()", False), ("x = 1", True)):
+        codes = {h["code"] for h in analyze_indicator_code_quality(base.format(copy=copy_line))}
+        assert ("MISSING_DF_COPY" in codes) is missing
@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+from app.services.indicator_params import IndicatorParamsParser
+
+_CODE = """
+# @param fast int 5 Fast period range=3:7:2
+    #   @param slow   INT 20 Slow period
+# @param show bool true Show markers
+# @param label string hello World label
+df = df.copy()
+x = 1  # not a @param declaration
+"""
+
+
+def test_parse_params_reads_declarations():
+    params = IndicatorParamsParser.parse_params(_CODE)
+
+    assert params == [
+        {"name": "fast", "type": "int", "default": 5, "description": "Fast period", "values": [3, 5, 7]},
+        {"name": "slow", "type": "int", "default": 20, "description": "Slow period"},
+        {"name": "show", "type": "bool", "default": True, "description": "Show markers"},
+        {"name": "label", "type": "str", "default": "hello", "description": "World label"},
+    ]
+
+
+def test_parse_params_returns_independent_copies_from_cache():
+    first = IndicatorParamsParser.parse_params(_CODE)
+    first[0]["default"] = 99
+    first[0]["values"].append(11)
+
+    second = IndicatorParamsParser.parse_params(_CODE)
+
+    assert second[0]["default"] == 5
+    assert second[0]["values"] == [3, 5, 7]
+
+
+def test_parse_params_handles_empty_and_param_free_code():
+    assert IndicatorParamsParser.parse_params("") == []
+    assert IndicatorParamsParser.parse_params("df['x'] = df['close']\n") == []
+
+
+def test_parse_params_handles_crlf_and_ignores_split_declarations():
+    code = "# @param a int 3 First\r\n# @param b float\r\n2.5 split across lines\r\n# @param c bool off\r\n"
+
+    params = IndicatorParamsParser.parse_params(code)
+
+    assert [(p["name"], p["default"], p["description"]) for p in params] == [
+        ("a", 3, "First"),
+        ("c", False, ""),
+    ]
+
+
+def test_apply_defaults_to_code_rewrites_declared_values():
+    code = "# @param fast int 5 Fast period\n  # @param show bool true Show\nx = 1\n"
+
+    out = IndicatorParamsParser.apply_defaults_to_code(code, {"fast": 8, "show": False})
+
+    assert out == "# @param fast int 8 Fast period\n# @param show bool false Show\nx = 1\n"
+    assert IndicatorParamsParser.apply_defaults_to_code(code, {"other": 1}) == code
+    assert IndicatorParamsParser.apply_defaults_to_code(
+        "# @param fast int 5 Fast\r\nx = 1\r\n", {"fast": 9}
+    ) == "# @param fast int 9 Fast\nx = 1\r\n"
+
+
+def _caller(monkeypatch, code):
+    from app.services.indicator_params import IndicatorCaller
+
+    caller = IndicatorCaller(user_id=1)
+    monkeypatch.setattr(caller, "_get_indicator_code", lambda ref: (code, 7))
+    return caller
+
+
+def _ohlcv():
+    import pandas as pd
+
+    return pd.DataFrame(
+        {
+            "open": [1.0, 2.0, 3.0],
+            "high": [2.0, 3.0, 4.0],
+            "low": [0.5, 1.5, 2.5],
+            "close": [1.5, 2.5, 3.5],
+            "volume": [10, 20, 30],
+        }
+    )
+
+
+def test_call_indicator_leaves_caller_frame_untouched(monkeypatch):
+    code = (
+        "df['sma'] = close.rolling(2).mean()\n"
+        "df.loc[df.index[0], 'close'] = -1.0\n"
+        "df['vol_f'] = volume * 2\n"
+    )
+    caller = _caller(monkeypatch, code)
+    df = _ohlcv()
+
+    out = caller.call_indicator(7, df)
+
+    assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+    assert df["close"].tolist() == [1.5, 2.5, 3.5]
+    assert out["close"].tolist() == [-1.0, 2.5, 3.5]
+    assert out["sma"].tolist()[1:] == [2.0, 3.0]
+    assert out["vol_f"].tolist() == [20.0, 40.0, 60.0]
+
+
+def test_call_indicator_returns_input_when_rejected(monkeypatch):
+    caller = _caller(monkeypatch, "import os\n")
+    df = _ohlcv()
+
+    assert caller.call_indicator(7, df) is df
+
+
+def test_param_free_code_skips_the_parse_cache():
+    from app.services import indicator_params as module
+
+    before = module._parse_params_cached.cache_info().currsize
+    assert IndicatorParamsParser.parse_params("df['y'] = df['close'] * 2  # no declarations\n") == []
+    assert IndicatorParamsParser.parse_params("@decorator\nmail = 'a@b.c'\n") == []
+    assert module._parse_params_cached.cache_info().currsize == before
+    assert IndicatorParamsParser.parse_params("# @PARAM n INT 3 upper-case\n")[0]["default"] == 3
+
+
+def test_merge_params_converts_user_values_by_declared_type():
+    declared = IndicatorParamsParser.parse_params(_CODE)
+
+    merged = IndicatorParamsParser.merge_params(
+        declared, {"fast": "8", "show": "OFF", "label": 12, "unknown": 1}
+    )
+
+    assert merged == {"fast": 8, "slow": 20, "show": False, "label": "12"}
+    assert IndicatorParamsParser._convert_value("abc", "int") == "abc"
+    assert IndicatorParamsParser._convert_value("Yes", "BOOL") is True
+    assert IndicatorParamsParser._convert_value("2.5", "float") == 2.5
+
+
+class _Cursor:
+    def __init__(self, row):
+        self.row = row
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+    def fetchone(self):
+        return self.row
+
+    def close(self):
+        return None
+
+
+class _Database:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.commits = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_args):
+        return False
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.commits += 1
+
+
+def _params_db(monkeypatch, row):
+    from app.services import indicator_params as params_module
+
+    cursor = _Cursor(row)
+    db = _Database(cursor)
+    monkeypatch.setattr(params_module, "get_db_connection", lambda: db)
+    return params_module, cursor, db
+
+
+def test_get_indicator_params_reads_persisted_json(monkeypatch):
+    stored = [{"name": "fast", "type": "int", "default": 5, "description": ""}]
+    params_module, cursor, db = _params_db(monkeypatch, {"params_json": stored, "code": None})
+
+    assert params_module.get_indicator_params(3) == stored
+    assert len(cursor.executed) == 1
+    assert db.commits == 0
+
+
+def test_get_indicator_params_backfills_missing_json(monkeypatch):
+    import json
+
+    params_module, cursor, db = _params_db(monkeypatch, {"params_json": None, "code": _CODE})
+
+    out = params_module.get_indicator_params(3)
+
+    assert [p["name"] for p in out] == ["fast", "slow", "show", "label"]
+    sql, args = cursor.executed[1]
+    assert "SET params_json" in sql
+    assert json.loads(args[0]) == out
+    assert args[1] == 3
+    assert db.commits == 1
+
+
+def test_indicator_code_lookups_are_cached_per_caller(monkeypatch):
+    from app.services.indicator_params import IndicatorCaller
+
+    _module, cursor, _db = _params_db(monkeypatch, {"id": 9, "code": "x = 1\n"})
+    caller = IndicatorCaller(user_id=4)
+
+    assert caller._get_indicator_code("Trend") == ("x = 1\n", 9)
+    assert caller._get_indicator_code("Trend") == ("x = 1\n", 9)
+    assert caller._get_indicator_code(9) == ("x = 1\n", 9)
+
+    assert len(cursor.executed) == 2
+    sql, args = cursor.executed[0]
+    assert "UNION" not in sql and "ORDER BY (user_id = %s) DESC" in sql
+    assert args == ("Trend", 4, 4)
+    assert IndicatorCaller(user_id=4)._get_indicator_code("Trend") == ("x = 1\n", 9)
+    assert len(cursor.executed) == 3
+
+
+def test_cached_param_entries_are_read_only():
+    import pytest
+
+    from app.services import indicator_params as module
+
+    entry = module._parse_params_cached(_CODE)[0]
+
+    with pytest.raises(TypeError):
+        entry["default"] = 1
+    assert entry["values"] == (3, 5, 7)
+    assert IndicatorParamsParser.parse_params(_CODE)[0]["values"] == [3, 5, 7]
+
+
+def test_call_indicator_short_circuits_empty_input(monkeypatch):
+    import pandas as pd
+
+    caller = _caller(monkeypatch, "df['y'] = 1\n")
+    lookups = []
+    monkeypatch.setattr(caller, "_get_indicator_code", lambda ref: lookups.append(ref) or ("df['y'] = 1\n", 7))
+    empty = _ohlcv().iloc[0:0]
+
+    assert caller.call_indicator(7, empty) is empty
+    assert isinstance(caller.call_indicator(7, None), pd.DataFrame)
+    assert lookups == []
+
+    blank = _caller(monkeypatch, "  \n\n")
+    df = _ohlcv()
+    assert blank.call_indicator(7, df) is df
+
+
+def test_call_indicator_uses_injected_numpy_and_pandas(monkeypatch):
+    from app.utils import safe_exec
+
+    seen = {}
+    real = safe_exec.safe_exec_with_validation
+
+    def spy(**kwargs):
+        seen.update(kwargs)
+        return real(**kwargs)
+
+    monkeypatch.setattr(safe_exec, "safe_exec_with_validation", spy)
+    caller = _caller(monkeypatch, "df['z'] = np.sqrt(pd.Series(close).abs())\n")
+
+    out = caller.call_indicator(7, _ohlcv())
+
+    assert seen["pre_import"] == ""
+    assert "z" in out.columns
+
+
+def test_parsed_names_and_types_are_interned():
+    import sys
+
+    params = IndicatorParamsParser.parse_params("# @param " + "".join(["ma_", "len"]) + " STRING abc\n")
+
+    assert params[0]["type"] == "str"
+    assert params[0]["name"] is sys.intern("ma_len")
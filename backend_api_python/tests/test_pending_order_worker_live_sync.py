@@ -249,3 +249,25 @@ def test_live_sent_sync_reconciles_ibkr_submitted_order(monkeypatch):
 )
 def test_live_order_status_normalization(raw, expected):
     assert normalize_live_order_status(raw) == expected
+
+
+def test_run_loop_wakes_on_stop_instead_of_sleeping_full_interval():
+    import threading
+    import time
+
+    worker = object.__new__(worker_module.PendingOrderWorker)
+    worker.poll_interval_sec = 60.0
+    worker._stop_event = threading.Event()
+    ticked = threading.Event()
+    worker._tick = ticked.set
+
+    thread = threading.Thread(target=worker._run_loop, daemon=True)
+    thread.start()
+    assert ticked.wait(timeout=2.0)
+
+    started = time.monotonic()
+    worker._stop_event.set()
+    thread.join(timeout=2.0)
+
+    assert not thread.is_alive()
+    assert time.monotonic() - started < 2.0
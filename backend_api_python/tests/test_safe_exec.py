@@ -320,3 +320,37 @@ def test_legit_pandas_strategy_passes_validator():
     ok, err = validate_code_safety(_LEGIT_PANDAS_STRATEGY)
     assert ok is True
     assert err is None
+
+
+def test_repeated_exec_reuses_compiled_code_object():
+    from app.utils.safe_exec import _compile_user_code
+
+    code = "value = sum(range(5))\n"
+    first = _compile_user_code(code, "<indicator 1>")
+    for _ in range(2):
+        env = {}
+        result = safe_exec_with_validation(code, env, env, pre_import='', filename="<indicator 1>")
+        assert result['success'], result['error']
+        assert env['value'] == 10
+    assert _compile_user_code(code, "<indicator 1>") is first
+
+
+def test_exec_error_traceback_names_the_source():
+    env = {}
+    result = safe_exec_with_validation("x = 1 / 0\n", env, env, pre_import='', filename="<indicator 42>")
+
+    assert not result['success']
+    assert '<indicator 42>' in result['error']
+
+
+def test_default_safe_builtins_are_fresh_copies():
+    first = build_safe_builtins()
+    first['len'] = None
+
+    second = build_safe_builtins()
+
+    assert second is not first
+    assert second['len'] is len
+    assert 'open' not in second and 'eval' not in second
+    assert 'getattr' in build_safe_builtins({'getattr'})
+    assert 'getattr' not in build_safe_builtins()
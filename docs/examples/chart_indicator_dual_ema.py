@@ -8,7 +8,8 @@
 my_indicator_name = "Dual EMA Viewer"
 my_indicator_description = "Chart-only EMA crossover indicator with visual event markers."
 
-df = df.copy()
+# Shallow copy: this script only reads OHLCV, so the columns need not be duplicated.
+df = df.copy(deep=False)
 
 fast_len = int(params.get("fast_len", 12))
 slow_len = int(params.get("slow_len", 26))
@@ -18,32 +19,40 @@ close = df["close"]
 high = df["high"]
 low = df["low"]
 
-def edge(condition):
-    s = condition.fillna(False).astype(bool)
-    previous = s.shift(1, fill_value=False).astype(bool)
-    return s & ~previous
+def shift_one(state):
+    out = np.zeros_like(state)
+    out[1:] = state[:-1]
+    return out
+
+def edge(state):
+    # True on the first bar of each run of True values.
+    return state & ~shift_one(state)
 
 def to_plot_list(series):
     return [None if pd.isna(v) else float(v) for v in series]
 
+def to_marks(condition, price, factor):
+    # Explicit None list; only the (sparse) event bars are visited.
+    marks = [None] * len(price)
+    values = price.to_numpy(dtype=float) * factor
+    for i in np.flatnonzero(condition).tolist():
+        marks[i] = float(values[i])
+    return marks
+
 ema_fast = close.ewm(span=fast_len, adjust=False).mean()
 ema_slow = close.ewm(span=slow_len, adjust=False).mean()
 
-golden = edge(ema_fast > ema_slow)
-death = edge(ema_fast < ema_slow)
+# One spread array drives both crossovers; NaN compares False on either side.
+spread = (ema_fast - ema_slow).to_numpy(dtype=float)
+golden = edge(spread > 0)
+death = edge(spread < 0)
 
 if confirm_next_bar:
-    golden = golden.shift(1, fill_value=False).astype(bool)
-    death = death.shift(1, fill_value=False).astype(bool)
+    golden = shift_one(golden)
+    death = shift_one(death)
 
-buy_marks = [
-    float(low.iloc[i] * 0.995) if bool(golden.iloc[i]) else None
-    for i in range(len(df))
-]
-sell_marks = [
-    float(high.iloc[i] * 1.005) if bool(death.iloc[i]) else None
-    for i in range(len(df))
-]
+buy_marks = to_marks(golden, low, 0.995)
+sell_marks = to_marks(death, high, 1.005)
 
 output = {
     "name": my_indicator_name,
@@ -25,7 +25,8 @@ my_indicator_description = (
 # @param use_volume bool false Require volume expansion for buy markers
 # @param volume_mult float 1.5 Volume expansion multiplier
 
-df = df.copy()
+# Shallow copy: this script only reads OHLCV, so the columns need not be duplicated.
+df = df.copy(deep=False)
 
 sma_short_period = int(params.get("sma_short", 10))
 sma_long_period = int(params.get("sma_long", 30))
@@ -41,12 +42,21 @@ high = df["high"]
 low = df["low"]
 volume = df["volume"]
 
+def to_marks(condition, price, factor):
+    # Explicit None list; only the (sparse) event bars are visited.
+    marks = [None] * len(price)
+    values = price.to_numpy(dtype=float) * factor
+    for i in np.flatnonzero(condition).tolist():
+        marks[i] = float(values[i])
+    return marks
+
 sma_short = close.rolling(sma_short_period).mean()
 sma_long = close.rolling(sma_long_period).mean()
 
+# Wilder RSI: recursive smoothing (ewm alpha=1/N) as on most charting tools.
 delta = close.diff()
-gain = delta.clip(lower=0).rolling(rsi_period).mean()
-loss = (-delta.clip(upper=0)).rolling(rsi_period).mean()
+gain = delta.clip(lower=0).ewm(alpha=1.0 / rsi_period, adjust=False, min_periods=rsi_period).mean()
+loss = (-delta.clip(upper=0)).ewm(alpha=1.0 / rsi_period, adjust=False, min_periods=rsi_period).mean()
 rs = gain / loss.replace(0, np.nan)
 rsi = 100 - (100 / (1 + rs))
 
@@ -58,42 +68,36 @@ macd_hist = macd - macd_signal
 
 volume_ma = volume.rolling(20).mean()
 
-trend_up = sma_short > sma_long
-trend_down = sma_short < sma_long
-rsi_buy_zone = rsi <= rsi_oversold
-rsi_sell_zone = rsi >= rsi_overbought
-macd_up = macd_hist > 0
-macd_down = macd_hist < 0
-volume_ok = volume > (volume_ma * volume_mult)
+# Conditions as plain bool arrays; comparisons against NaN warm-up bars are False.
+trend_up = (sma_short > sma_long).to_numpy(dtype=bool)
+trend_down = (sma_short < sma_long).to_numpy(dtype=bool)
+rsi_buy_zone = (rsi <= rsi_oversold).to_numpy(dtype=bool)
+rsi_sell_zone = (rsi >= rsi_overbought).to_numpy(dtype=bool)
 
-buy_condition = (trend_up & rsi_buy_zone).fillna(False)
-sell_condition = (trend_down & rsi_sell_zone).fillna(False)
+buy_state = trend_up & rsi_buy_zone
+sell_state = trend_down & rsi_sell_zone
 
 if use_macd:
-    buy_condition = buy_condition & macd_up.fillna(False)
-    sell_condition = sell_condition & macd_down.fillna(False)
+    np.logical_and(buy_state, (macd_hist > 0).to_numpy(dtype=bool), out=buy_state)
+    np.logical_and(sell_state, (macd_hist < 0).to_numpy(dtype=bool), out=sell_state)
 
 if use_volume:
-    buy_condition = buy_condition & volume_ok.fillna(False)
-
-buy_state = buy_condition.fillna(False).astype(bool)
-sell_state = sell_condition.fillna(False).astype(bool)
-buy_edge = buy_state & ~buy_state.shift(1, fill_value=False).astype(bool)
-sell_edge = sell_state & ~sell_state.shift(1, fill_value=False).astype(bool)
-
-buy_marks = [
-    float(low.iloc[i] * 0.995) if bool(buy_edge.iloc[i]) else None
-    for i in range(len(df))
-]
-sell_marks = [
-    float(high.iloc[i] * 1.005) if bool(sell_edge.iloc[i]) else None
-    for i in range(len(df))
-]
-
-trend_lamp = [
-    "up" if bool(trend_up.fillna(False).iloc[i]) else "down" if bool(trend_down.fillna(False).iloc[i]) else "flat"
-    for i in range(len(df))
-]
+    np.logical_and(buy_state, (volume > volume_ma * volume_mult).to_numpy(dtype=bool), out=buy_state)
+
+# Edge-trigger: compare each bar with the previous slice.
+buy_edge = buy_state.copy()
+buy_edge[1:] &= ~buy_state[:-1]
+sell_edge = sell_state.copy()
+sell_edge[1:] &= ~sell_state[:-1]
+
+buy_marks = to_marks(buy_edge, low, 0.995)
+sell_marks = to_marks(sell_edge, high, 1.005)
+
+trend_lamp = np.select(
+    [trend_up, trend_down],
+    ["up", "down"],
+    default="flat",
+).tolist()
 
 output = {
     "name": my_indicator_name,